@@ -13,6 +13,8 @@ import numpy as np
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 from scripts.analyze_cryptopunks_data import analyze_cryptopunks_transfers
+from scripts.utils import instrument
+from scripts.column_store import PROCESSED_DATA_DIR, column_store_is_current, open_column_store
 
 # Streamlit Config
 st.set_page_config(
@@ -67,18 +69,40 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@instrument()
 def load_data():
     """
     Loads processed CryptoPunks transfer data.
+    Uses the memory-mapped column store when it was built from the current CSV, otherwise the CSV.
     """
+    csv_path = os.path.join(PROCESSED_DATA_DIR, "cryptopunks_transfers_cleaned.csv")
     try:
-        df = pd.read_csv(os.path.join(project_root, "data", "processed", "cryptopunks_transfers_cleaned.csv"))
+        if column_store_is_current(csv_path):
+            return open_column_store().to_frame()
+        df = pd.read_csv(csv_path)
         df['timeStamp'] = pd.to_datetime(df['timeStamp'])
         return df
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None
 
+@instrument()
+def load_sales():
+    """
+    Loads decoded CryptoPunks sales, or None if the pipeline has not produced them yet.
+    """
+    sales_path = os.path.join(PROCESSED_DATA_DIR, "cryptopunks_sales.csv")
+    if not os.path.exists(sales_path):
+        return None
+    try:
+        sales_df = pd.read_csv(sales_path)
+        sales_df['timeStamp'] = pd.to_datetime(sales_df['timeStamp'])
+        return sales_df
+    except Exception as e:
+        st.error(f"Error loading sales data: {str(e)}")
+        return None
+
+@instrument()
 def filter_data(df, date_filter, size_filter, start_date=None, end_date=None):
     """Filter data based on user selections"""
     filtered_df = df.copy()
@@ -112,6 +136,7 @@ def filter_data(df, date_filter, size_filter, start_date=None, end_date=None):
     
     return filtered_df
 
+@instrument()
 def create_holder_concentration_chart(df):
     """Create holder concentration donut chart"""
     holder_stats = df.groupby('receiver')['value'].sum().sort_values(ascending=False)
@@ -139,6 +164,7 @@ def create_holder_concentration_chart(df):
     
     return fig
 
+@instrument()
 def create_transaction_distribution(df):
     """Create transaction size distribution chart"""
     df['size_category'] = pd.cut(
@@ -169,6 +195,7 @@ def create_transaction_distribution(df):
     
     return fig
 
+@instrument()
 def create_price_analysis_chart(df):
     """Create price analysis chart"""
     fig = go.Figure()
@@ -212,6 +239,7 @@ def create_price_analysis_chart(df):
     
     return fig
 
+@instrument()
 def create_volume_analysis_chart(df):
     """Create volume analysis chart"""
     daily_volume = df.resample('D', on='timeStamp')['value'].agg(['sum', 'count']).reset_index()
@@ -264,6 +292,7 @@ def main():
     df = load_data()
     if df is None:
         return
+    sales_df = load_sales()
 
     # Sidebar for filters
     with st.sidebar:
@@ -288,7 +317,16 @@ def main():
             end_date = None
 
     # Filter the data
-    filtered_df = filter_data(df, date_filter, size_filter, start_date, end_date)
+    # Transfers only carry placeholder values, so when sales are available they drive every value-based
+    # widget and the size filter; transfers are then only used for holder concentration
+    if sales_df is not None:
+        filtered_df = filter_data(df, date_filter, [], start_date, end_date)
+        filtered_sales_df = filter_data(sales_df, date_filter, size_filter, start_date, end_date)
+        market_df = filtered_sales_df
+    else:
+        filtered_df = filter_data(df, date_filter, size_filter, start_date, end_date)
+        filtered_sales_df = None
+        market_df = filtered_df
 
     # Key Metrics Dashboard
     st.markdown('<div class="section-header">Key Metrics</div>', unsafe_allow_html=True)
@@ -298,8 +336,8 @@ def main():
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric(
             "Total Volume",
-            f"Ξ {filtered_df['value'].sum():,.2f}",
-            f"+{(filtered_df['value'].tail(7).sum() / filtered_df['value'].head(7).sum() - 1):.1%}"
+            f"Ξ {market_df['value'].sum():,.2f}",
+            f"+{(market_df['value'].tail(7).sum() / market_df['value'].head(7).sum() - 1):.1%}"
         )
         st.markdown('</div>', unsafe_allow_html=True)
         
@@ -307,8 +345,8 @@ def main():
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric(
             "Active Holders",
-            f"{filtered_df['receiver'].nunique():,}",
-            f"+{(filtered_df['receiver'].tail(7).nunique() / filtered_df['receiver'].head(7).nunique() - 1):.1%}"
+            f"{market_df['receiver'].nunique():,}",
+            f"+{(market_df['receiver'].tail(7).nunique() / market_df['receiver'].head(7).nunique() - 1):.1%}"
         )
         st.markdown('</div>', unsafe_allow_html=True)
         
@@ -316,8 +354,8 @@ def main():
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric(
             "Avg Transaction",
-            f"Ξ {filtered_df['value'].mean():,.2f}",
-            f"{(filtered_df['value'].tail(7).mean() / filtered_df['value'].head(7).mean() - 1):.1%}"
+            f"Ξ {market_df['value'].mean():,.2f}",
+            f"{(market_df['value'].tail(7).mean() / market_df['value'].head(7).mean() - 1):.1%}"
         )
         st.markdown('</div>', unsafe_allow_html=True)
         
@@ -325,8 +363,8 @@ def main():
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric(
             "Daily Transactions",
-            f"{filtered_df.groupby(filtered_df['timeStamp'].dt.date)['value'].count().mean():.0f}",
-            f"{(filtered_df.tail(7)['value'].count() / filtered_df.head(7)['value'].count() - 1):.1%}"
+            f"{market_df.groupby(market_df['timeStamp'].dt.date)['value'].count().mean():.0f}",
+            f"{(market_df.tail(7)['value'].count() / market_df.head(7)['value'].count() - 1):.1%}"
         )
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -338,15 +376,18 @@ def main():
         st.plotly_chart(create_holder_concentration_chart(filtered_df), use_container_width=True)
     
     with col2:
-        st.plotly_chart(create_transaction_distribution(filtered_df), use_container_width=True)
+        st.plotly_chart(create_transaction_distribution(market_df), use_container_width=True)
 
     # Price Analysis
     st.markdown('<div class="section-header">Price Analysis</div>', unsafe_allow_html=True)
-    st.plotly_chart(create_price_analysis_chart(filtered_df), use_container_width=True)
+    if filtered_sales_df is not None:
+        st.plotly_chart(create_price_analysis_chart(filtered_sales_df), use_container_width=True)
+    else:
+        st.info("No sales data found. Run scripts/run_pipeline.py to decode sale prices from market events.")
 
     # Volume Analysis
     st.markdown('<div class="section-header">Trading Activity</div>', unsafe_allow_html=True)
-    st.plotly_chart(create_volume_analysis_chart(filtered_df), use_container_width=True)
+    st.plotly_chart(create_volume_analysis_chart(market_df), use_container_width=True)
 
     # Footer
     st.markdown("---")
@@ -1,16 +1,60 @@
 # scripts/analyze_cryptopunks_data.py
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
+import os
+import sys
+import warnings
 
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.utils import instrument
+from scripts.column_store import ColumnStore
+from scripts import sql_store
+from scripts.sql_store import query, time_range
+
+NS_PER_DAY = 86400 * 10**9
+ROLLING_CHUNK_SIZE = 100_000  # Windows reduced at a time by _rolling_mean_std
+SQL_BATCH_SIZE = 900  # Row IDs per IN (...) lookup, below SQLite's default limit on bound parameters
+
+def _day_dates(days):
+    """
+    Converts day numbers (days since the epoch) to datetime.date objects.
+    """
+    return pd.to_datetime(np.asarray(days) * NS_PER_DAY, unit='ns').date
+
+def _daily_groups(store):
+    """
+    Returns the distinct days in a column store and each row's position among them.
+    Rows are sorted by timestamp, so the days are already in order.
+    """
+    return np.unique(store.day_index(), return_inverse=True)
+
+@instrument()
 def analyze_holders(df):
     """
     Analyzes holder statistics and categorizes holders.
     """
-    holder_stats = df.groupby('receiver')['value'].sum().reset_index()
+    if isinstance(df, ColumnStore):
+        values = df['value']
+        valid = ~np.isnan(values)  # Skip NaN values like groupby().sum() does
+        totals = np.bincount(df['receiver_id'][valid], weights=values[valid], minlength=len(df.addresses))
+        received = np.bincount(df['receiver_id'], minlength=len(df.addresses)) > 0
+        ids = np.flatnonzero(received)
+        holder_stats = pd.DataFrame({'receiver': df.address(ids), 'value': totals[ids]})
+    else:
+        holder_stats = df.groupby('receiver')['value'].sum().reset_index()
+
+    return categorize_holders(holder_stats)
+
+def categorize_holders(holder_stats):
+    """
+    Drops holders without value and categorizes the rest by their total value.
+    """
     holder_stats = holder_stats.dropna(subset=['value'])
-    holder_stats = holder_stats[holder_stats['value'] > 0]
+    holder_stats = holder_stats[holder_stats['value'] > 0].copy()
 
     # Categorize holders
     unique_values = holder_stats['value'].nunique()
@@ -47,15 +91,32 @@ def analyze_holders(df):
 
     return holder_stats
 
+@instrument()
 def analyze_liquidity(df):
     """
     Analyzes daily trading metrics and calculates liquidity score.
     """
-    daily_volume = df.groupby('date')['value'].agg([
-        ('value', 'sum'),
-        ('transaction_count', 'count')
-    ]).reset_index()
+    if isinstance(df, ColumnStore):
+        days, day_ids = _daily_groups(df)
+        values = df['value']
+        valid = ~np.isnan(values)  # NaN values are neither summed nor counted, like groupby().agg()
+        daily_volume = pd.DataFrame({
+            'date': _day_dates(days),
+            'value': np.bincount(day_ids[valid], weights=values[valid], minlength=len(days)),
+            'transaction_count': np.bincount(day_ids[valid], minlength=len(days))
+        })
+    else:
+        daily_volume = df.groupby('date')['value'].agg([
+            ('value', 'sum'),
+            ('transaction_count', 'count')
+        ]).reset_index()
 
+    return liquidity_score(daily_volume)
+
+def liquidity_score(daily_volume):
+    """
+    Scores each day's liquidity relative to the average day.
+    """
     liquidity = daily_volume.copy()
     liquidity['liquidity_score'] = (
         liquidity['value'] * 
@@ -65,10 +126,14 @@ def analyze_liquidity(df):
 
     return liquidity
 
+@instrument()
 def analyze_market_impact(df):
     """
     Analyzes whale transactions and calculates price impact.
     """
+    if isinstance(df, ColumnStore):
+        return _market_impact_from_columns(df)
+
     whale_threshold = df['value'].quantile(0.9)
     whale_trades = df[df['value'] >= whale_threshold].copy()
 
@@ -82,10 +147,82 @@ def analyze_market_impact(df):
 
     return whale_trades, price_impact
 
+def _market_impact_from_columns(store):
+    """
+    Column store version of analyze_market_impact.
+    """
+    values = store['value']
+    valid = ~np.isnan(values)  # NaN values are skipped, like Series.quantile and groupby().mean()
+    whale_threshold = np.nanquantile(values, 0.9) if valid.any() else np.nan
+    whale_mask = values >= whale_threshold
+
+    days, day_ids = _daily_groups(store)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily_avg_price = (
+            np.bincount(day_ids[valid], weights=values[valid], minlength=len(days))
+            / np.bincount(day_ids[valid], minlength=len(days))
+        )
+    whale_sum = np.bincount(day_ids[whale_mask], weights=values[whale_mask], minlength=len(days))
+    whale_count = np.bincount(day_ids[whale_mask], minlength=len(days))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        whale_daily_avg = whale_sum / whale_count
+
+    whale_trades = store.to_frame(whale_mask)
+    whale_trades['date'] = whale_trades['timeStamp'].dt.date
+
+    dates = _day_dates(days)
+    price_impact = pd.DataFrame({
+        'timeStamp': dates,
+        'value': whale_daily_avg / daily_avg_price
+    }, index=dates).fillna(1.0)  # Fill days without whale trades with 1.0 (no impact)
+
+    return whale_trades, price_impact
+
+def _rolling_mean_std(values, window, chunk_size=ROLLING_CHUNK_SIZE):
+    """
+    Rolling mean and sample standard deviation with min_periods=1.
+    Each window is computed on its own (two-pass), so large values elsewhere in the history can't cancel out precision.
+    NaN values are skipped like pandas' rolling does; windows with fewer than two values get a NaN std.
+    """
+    n = len(values)
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    # The NaN-skipping reductions copy every window, so only use them when there is something to skip
+    mean_fn, std_fn = (np.nanmean, np.nanstd) if np.isnan(values).any() else (np.mean, np.std)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN windows and windows with one value
+
+        # The first window - 1 rows only have a partial window
+        for end in range(min(window - 1, n)):
+            mean[end] = mean_fn(values[:end + 1])
+            if end > 0:
+                std[end] = std_fn(values[:end + 1], ddof=1)
+
+        if n >= window:
+            windows = sliding_window_view(values, window)  # Row i holds values[i:i + window]
+            # Full windows are reduced in chunks so temporaries stay bounded at chunk_size * window floats
+            for start in range(0, len(windows), chunk_size):
+                block = windows[start:start + chunk_size]
+                mean[window - 1 + start:window - 1 + start + len(block)] = mean_fn(block, axis=1)
+                std[window - 1 + start:window - 1 + start + len(block)] = std_fn(block, axis=1, ddof=1)
+
+    return mean, std
+
+@instrument()
 def detect_anomalies(df):
     """
     Detects anomalies in transaction values using rolling statistics.
     """
+    if isinstance(df, ColumnStore):
+        values = np.asarray(df['value'])
+        rolling_mean, rolling_std = _rolling_mean_std(values, window=50)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_scores = np.abs((values - rolling_mean) / rolling_std)
+        anomalies = df.to_frame(z_scores > 3)
+        anomalies['date'] = anomalies['timeStamp'].dt.date
+        return anomalies
+
     df_sorted = df.sort_values('timeStamp')
     rolling_mean = df_sorted['value'].rolling(window=50, min_periods=1).mean()
     rolling_std = df_sorted['value'].rolling(window=50, min_periods=1).std()
@@ -95,14 +232,103 @@ def detect_anomalies(df):
 
     return anomalies
 
+# SQL pushdown versions: filtering and aggregation run inside the SQL store, using its indexes
+
+@instrument()
+def analyze_holders_sql(conn, start=None, end=None, table='transfers'):
+    """
+    SQL version of analyze_holders.
+    """
+    where, params = time_range(start, end)
+    holder_stats = query(conn, f"SELECT receiver, SUM(value) AS value FROM {table}{where} GROUP BY receiver", params)
+    return categorize_holders(holder_stats)
+
+@instrument()
+def analyze_liquidity_sql(conn, start=None, end=None, table='sales'):
+    """
+    SQL version of analyze_liquidity.
+    """
+    liquidity = sql_store.daily_volume(conn, start, end, table)
+    liquidity['date'] = pd.to_datetime(liquidity['date']).dt.date
+    return liquidity_score(liquidity)
+
+@instrument()
+def analyze_market_impact_sql(conn, start=None, end=None, table='sales'):
+    """
+    SQL version of analyze_market_impact.
+    """
+    where, params = time_range(start, end)
+    count = conn.execute(f"SELECT COUNT(value) FROM {table}{where}", params).fetchone()[0]
+    if count == 0:
+        return query(conn, f"SELECT * FROM {table} LIMIT 0"), pd.DataFrame(columns=['timeStamp', 'value'])
+
+    # 90th percentile with linear interpolation over non-NULL values, matching Series.quantile
+    position = 0.9 * (count - 1)
+    lower = int(np.floor(position))
+    not_null = f"{where} AND value IS NOT NULL" if where else " WHERE value IS NOT NULL"
+    neighbours = [row[0] for row in conn.execute(
+        f"SELECT value FROM {table}{not_null} ORDER BY value LIMIT 2 OFFSET ?", params + [lower]
+    )]
+    whale_threshold = neighbours[0] + (neighbours[-1] - neighbours[0]) * (position - lower)
+
+    whale_condition = f"{where} AND value >= ?" if where else " WHERE value >= ?"
+    whale_trades = query(conn, f"SELECT * FROM {table}{whale_condition} ORDER BY timeStamp", params + [whale_threshold])
+    whale_trades['timeStamp'] = pd.to_datetime(whale_trades['timeStamp'], unit='s')
+
+    daily = query(
+        conn,
+        f"""SELECT date,
+                   AVG(value) AS daily_avg,
+                   AVG(CASE WHEN value >= ? THEN value END) AS whale_avg
+            FROM {table}{where} GROUP BY date ORDER BY date""",
+        [whale_threshold] + params
+    )
+    dates = pd.to_datetime(daily['date']).dt.date
+    price_impact = pd.DataFrame({
+        'timeStamp': dates.to_numpy(),
+        'value': (daily['whale_avg'] / daily['daily_avg']).to_numpy()
+    }, index=dates.to_numpy()).fillna(1.0)  # Fill days without whale trades with 1.0 (no impact)
+
+    return whale_trades, price_impact
+
+@instrument()
+def detect_anomalies_sql(conn, start=None, end=None, table='sales', window=50):
+    """
+    SQL version of detect_anomalies.
+    The range filter and ordering run in SQL through the timestamp index; the rolling statistics are
+    computed per window by _rolling_mean_std, since one-pass SQL window sums lose precision after large values.
+    """
+    where, params = time_range(start, end)
+    rows = conn.execute(f"SELECT rowid, value FROM {table}{where} ORDER BY timeStamp, rowid", params).fetchall()
+    rowids = np.array([row[0] for row in rows], dtype='int64')
+    values = np.array([row[1] for row in rows], dtype='float64')  # NULL becomes NaN
+
+    rolling_mean, rolling_std = _rolling_mean_std(values, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_scores = np.abs((values - rolling_mean) / rolling_std)
+    anomaly_ids = rowids[z_scores > 3].tolist()
+
+    # Fetch the anomalous rows in batches below SQLite's bound parameter limit
+    batches = [anomaly_ids[i:i + SQL_BATCH_SIZE] for i in range(0, len(anomaly_ids), SQL_BATCH_SIZE)] or [[]]
+    anomalies = pd.concat([
+        query(conn, f"SELECT * FROM {table} WHERE rowid IN ({', '.join('?' for _ in batch)}) ORDER BY timeStamp, rowid", batch)
+        for batch in batches
+    ], ignore_index=True)
+
+    anomalies['timeStamp'] = pd.to_datetime(anomalies['timeStamp'], unit='s')
+    return anomalies
+
+@instrument()
 def analyze_cryptopunks_transfers(df):
     """
     Performs advanced analysis of CryptoPunks transfer data.
+    Accepts either a DataFrame or a memory-mapped ColumnStore.
     """
     try:
-        # Ensure timeStamp is datetime
-        df['timeStamp'] = pd.to_datetime(df['timeStamp'])
-        df['date'] = df['timeStamp'].dt.date
+        # Ensure timeStamp is datetime (column stores already hold int64 timestamps)
+        if not isinstance(df, ColumnStore):
+            df['timeStamp'] = pd.to_datetime(df['timeStamp'])
+            df['date'] = df['timeStamp'].dt.date
 
         # Perform analyses
         holder_stats = analyze_holders(df)
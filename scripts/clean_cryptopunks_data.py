@@ -1,27 +1,37 @@
 # scripts/clean_cryptopunks_data.py
 import os
 import json
+import sys
 import pandas as pd
 
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+from scripts.utils import instrument
+from scripts.sql_store import load_into_sql_store
+from scripts.column_store import write_column_store
+
 # Constants
-RAW_DATA_DIR = r"C:\Users\USER PC\Desktop\DATA PROJECTS\cryptopunks-analysis\data\raw"  # Path to raw data
-PROCESSED_DATA_DIR = r"C:\Users\USER PC\Desktop\DATA PROJECTS\cryptopunks-analysis\data\processed"  # Path to processed data
+DATA_DIR = os.getenv("CRYPTOPUNKS_DATA_DIR", os.path.join(PROJECT_ROOT, "data"))  # Root of the data directory
+RAW_DATA_DIR = os.path.join(DATA_DIR, "raw")  # Path to raw data
+PROCESSED_DATA_DIR = os.path.join(DATA_DIR, "processed")  # Path to processed data
 
 def ensure_directory_exists(directory):
     """
     Ensures the specified directory exists. If not, creates it.
     """
     if not os.path.exists(directory):
-        os.makedirs(directory)
+        os.makedirs(directory, exist_ok=True)
         print(f"Created directory: {directory}")
     else:
         print(f"Directory already exists: {directory}")
 
-def load_json_data(filename):
+@instrument("parse")
+def load_json_data(filename, directory=None):
     """
-    Loads JSON data from a file in the raw data directory.
+    Loads JSON data from a file in the raw data directory (or the given directory).
     """
-    raw_data_path = os.path.join(RAW_DATA_DIR, filename)
+    raw_data_path = os.path.join(directory or RAW_DATA_DIR, filename)
     print(f"Loading raw data from: {raw_data_path}")  # Debugging statement
 
     try:
@@ -36,6 +46,7 @@ def load_json_data(filename):
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+@instrument("clean_etherscan")
 def clean_etherscan_data(etherscan_data):
     """
     Cleans and preprocesses raw CryptoPunks transfer data from Etherscan.
@@ -45,7 +56,7 @@ def clean_etherscan_data(etherscan_data):
 
     # Convert columns to appropriate data types
     df["value"] = df["value"].astype(float) / 1e18  # Convert value from wei to ETH
-    df["timeStamp"] = pd.to_datetime(df["timeStamp"], unit="s")  # Convert timestamp to datetime
+    df["timeStamp"] = pd.to_datetime(df["timeStamp"].astype("int64"), unit="s")  # Convert timestamp to datetime
 
     # Rename columns for clarity
     df.rename(columns={"from": "sender", "to": "receiver"}, inplace=True)
@@ -53,6 +64,7 @@ def clean_etherscan_data(etherscan_data):
     print("Etherscan data cleaned successfully!")  # Debugging statement
     return df
 
+@instrument("clean_coingecko")
 def clean_coingecko_data(coingecko_data):
     """
     Cleans and preprocesses ETH price data from CoinGecko.
@@ -64,6 +76,7 @@ def clean_coingecko_data(coingecko_data):
     print("CoinGecko data cleaned successfully!")  # Debugging statement
     return df
 
+@instrument("merge")
 def merge_data(etherscan_df, coingecko_df):
     """
     Merges Etherscan and CoinGecko data.
@@ -78,16 +91,18 @@ def merge_data(etherscan_df, coingecko_df):
     print("Data merged successfully!")  # Debugging statement
     return merged_df
 
-def save_cleaned_data(df, filename):
+@instrument("save_processed")
+def save_cleaned_data(df, filename, directory=None):
     """
-    Saves cleaned data to a CSV file in the processed data directory.
+    Saves cleaned data to a CSV file in the processed data directory (or the given directory).
     """
+    directory = directory or PROCESSED_DATA_DIR
     try:
         # Ensure the processed data directory exists
-        ensure_directory_exists(PROCESSED_DATA_DIR)
+        ensure_directory_exists(directory)
 
         # Construct the full file path
-        processed_data_path = os.path.join(PROCESSED_DATA_DIR, filename)
+        processed_data_path = os.path.join(directory, filename)
         print(f"Saving processed data to: {processed_data_path}")  # Debugging statement
 
         # Save the data to a CSV file
@@ -117,6 +132,12 @@ def clean_cryptopunks_transfers():
 
         # Save cleaned data
         save_cleaned_data(merged_df, "cryptopunks_transfers_cleaned.csv")
+
+        # Rebuild the column store so the dashboard doesn't read stale data
+        write_column_store(merged_df, source=os.path.join(PROCESSED_DATA_DIR, "cryptopunks_transfers_cleaned.csv"))
+
+        # Append new transfers to the SQL store for indexed queries
+        load_into_sql_store(transfers=merged_df)
     else:
         print("Skipping data cleaning due to missing raw data.")
 
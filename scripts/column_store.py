@@ -0,0 +1,179 @@
+# scripts/column_store.py
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+from scripts.utils import instrument, log_info
+
+# Constants
+DATA_DIR = os.getenv("CRYPTOPUNKS_DATA_DIR", os.path.join(PROJECT_ROOT, "data"))  # Root of the data directory
+PROCESSED_DATA_DIR = os.path.join(DATA_DIR, "processed")  # Path to processed data
+COLUMN_STORE_DIR = os.path.join(PROCESSED_DATA_DIR, "column_store")  # Path to the column store
+MANIFEST_FILE = "manifest.json"
+STORE_VERSION = 1
+
+# Column name -> dtype; timeStamp is nanoseconds since the epoch, sender/receiver are address IDs
+COLUMNS = {
+    "blockNumber": "int64",
+    "timeStamp": "int64",
+    "value": "float64",
+    "sender_id": "int32",
+    "receiver_id": "int32",
+}
+
+class ColumnStore:
+    """
+    Read-only, memory-mapped view of the processed transfers, one array per column.
+    Rows are sorted by timestamp.
+    """
+    def __init__(self, directory, manifest, columns, addresses):
+        self.directory = directory
+        self.manifest = manifest
+        self.columns = columns
+        self.addresses = addresses
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def keys(self):
+        return self.columns.keys()
+
+    def address(self, ids):
+        """
+        Maps address IDs back to address strings.
+        """
+        return self.addresses[ids]
+
+    def day_index(self):
+        """
+        Returns the day number (days since the epoch) of every row.
+        """
+        return self.columns["timeStamp"] // (86400 * 10**9)
+
+    def to_frame(self, mask=None):
+        """
+        Builds a DataFrame with the original column names, optionally for a subset of rows.
+        """
+        def take(name):
+            column = self.columns[name]
+            return column[mask] if mask is not None else column
+
+        return pd.DataFrame({
+            "blockNumber": take("blockNumber"),
+            "timeStamp": pd.to_datetime(take("timeStamp"), unit="ns"),
+            "value": take("value"),
+            "sender": self.address(take("sender_id")),
+            "receiver": self.address(take("receiver_id")),
+        })
+
+def _column_path(directory, name):
+    return os.path.join(directory, f"{name}.npy")
+
+def _source_signature(path):
+    """
+    Returns the size and modification time of the file a store was built from.
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+@instrument()
+def write_column_store(df, directory=None, source=None):
+    """
+    Writes the processed transfers as one .npy file per column plus a manifest.
+    `source` is the CSV the data came from; it is recorded so stale stores can be detected.
+    """
+    directory = directory or COLUMN_STORE_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    timestamps = pd.to_datetime(df["timeStamp"]).to_numpy(dtype="datetime64[ns]").view("int64")
+    order = np.argsort(timestamps, kind="stable")
+
+    # Encode sender and receiver addresses as IDs into one shared address table
+    addresses, address_ids = np.unique(
+        np.concatenate([df["sender"].to_numpy(dtype=str), df["receiver"].to_numpy(dtype=str)]),
+        return_inverse=True
+    )
+    address_ids = address_ids.astype("int32")
+    sender_ids, receiver_ids = address_ids[:len(df)], address_ids[len(df):]
+
+    columns = {
+        "blockNumber": df["blockNumber"].to_numpy(dtype="int64"),
+        "timeStamp": timestamps,
+        "value": df["value"].to_numpy(dtype="float64"),
+        "sender_id": sender_ids,
+        "receiver_id": receiver_ids,
+    }
+    for name, dtype in COLUMNS.items():
+        np.save(_column_path(directory, name), columns[name][order].astype(dtype))
+    np.save(_column_path(directory, "addresses"), addresses)
+
+    manifest = {
+        "version": STORE_VERSION,
+        "rows": int(len(df)),
+        "columns": {name: {"file": f"{name}.npy", "dtype": dtype} for name, dtype in COLUMNS.items()},
+        "addresses": {"file": "addresses.npy", "count": int(len(addresses))},
+        "source": _source_signature(source) if source else None,
+    }
+    # Write the manifest last so a partially written store is never opened
+    with open(os.path.join(directory, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    return manifest
+
+@instrument()
+def open_column_store(directory=None):
+    """
+    Opens a column store with every column memory-mapped; nothing is read until it is used.
+    """
+    directory = directory or COLUMN_STORE_DIR
+    with open(os.path.join(directory, MANIFEST_FILE), "r") as f:
+        manifest = json.load(f)
+
+    if manifest.get("version") != STORE_VERSION:
+        raise ValueError(f"Unsupported column store version: {manifest.get('version')}")
+
+    columns = {}
+    for name, spec in manifest["columns"].items():
+        column = np.load(os.path.join(directory, spec["file"]), mmap_mode="r")
+        if column.dtype != np.dtype(spec["dtype"]) or len(column) != manifest["rows"]:
+            raise ValueError(f"Column {name} does not match the manifest in {directory}")
+        columns[name] = column
+    addresses = np.load(os.path.join(directory, manifest["addresses"]["file"]), mmap_mode="r")
+
+    return ColumnStore(directory, manifest, columns, addresses)
+
+def column_store_is_current(source, directory=None):
+    """
+    Returns True if the store exists and was built from the current contents of `source`.
+    """
+    manifest_path = os.path.join(directory or COLUMN_STORE_DIR, MANIFEST_FILE)
+    if not os.path.exists(manifest_path) or not os.path.exists(source):
+        return False
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    return manifest.get("source") == _source_signature(source)
+
+def build_column_store():
+    """
+    Builds the column store from the processed transfers CSV.
+    """
+    csv_path = os.path.join(PROCESSED_DATA_DIR, "cryptopunks_transfers_cleaned.csv")
+    log_info(f"Building column store from: {csv_path}")
+    df = pd.read_csv(csv_path, usecols=["blockNumber", "timeStamp", "value", "sender", "receiver"])
+    manifest = write_column_store(df, source=csv_path)
+    log_info(f"Column store with {manifest['rows']} rows written to {COLUMN_STORE_DIR}")
+
+# Run the function
+if __name__ == "__main__":
+    build_column_store()
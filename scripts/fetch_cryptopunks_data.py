@@ -1,26 +1,41 @@
 # scripts/fetch_cryptopunks_data.py
 import os
+import sys
+import time
 import requests
 import json
 from dotenv import load_dotenv
 
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+from scripts.utils import instrument, log_info, log_error
+from scripts.market_events import MARKET_EVENT_TOPICS
+
 # Load environment variables from .env file
 load_dotenv()
 
 # Constants
 CONTRACT_ADDRESS = "0xb47e3cd837dDF8e4c57F05d70Ab865de6e193BBB"  # CryptoPunks contract address
-RAW_DATA_DIR = r"C:\Users\USER PC\Desktop\DATA PROJECTS\cryptopunks-analysis\data\raw"  # Absolute path to the raw data directory
+DATA_DIR = os.getenv("CRYPTOPUNKS_DATA_DIR", os.path.join(PROJECT_ROOT, "data"))  # Root of the data directory
+RAW_DATA_DIR = os.path.join(DATA_DIR, "raw")  # Path to the raw data directory
+LOGS_PAGE_SIZE = 1000  # Maximum number of logs Etherscan returns per request
+LOGS_MAX_PAGES = 10  # Etherscan only pages through the first 10,000 results of a query
+LOGS_REQUEST_DELAY = 0.25  # Seconds between log requests; the free Etherscan tier allows 5 calls per second
+LOGS_MAX_RETRIES = 3  # Retries of a failed log request before giving up
+NO_RECORDS_MESSAGE = "No records found"  # Etherscan's message for an empty (not failed) result
 
 def ensure_directory_exists(directory):
     """
     Ensures the specified directory exists. If not, creates it.
     """
     if not os.path.exists(directory):
-        os.makedirs(directory)
+        os.makedirs(directory, exist_ok=True)
         print(f"Created directory: {directory}")
     else:
         print(f"Directory already exists: {directory}")
 
+@instrument("fetch_transfers")
 def fetch_etherscan_data():
     """
     Fetches CryptoPunks transfer data from the Etherscan API.
@@ -57,6 +72,7 @@ def fetch_etherscan_data():
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+@instrument("fetch_prices")
 def fetch_coingecko_data():
     """
     Fetches ETH price data from the CoinGecko API.
@@ -91,17 +107,95 @@ def fetch_coingecko_data():
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
-def save_data(data, filename):
+def fetch_logs_page(url):
+    """
+    Requests one page of logs and returns its result list.
+    Returns an empty list when Etherscan has no records; retries with a growing delay on any other
+    error (e.g. the rate limit) and raises once the retries are used up, so a failed page is never
+    mistaken for the end of the data.
+    """
+    for attempt in range(LOGS_MAX_RETRIES + 1):
+        response = requests.get(url)
+        response.raise_for_status()  # Raise an exception for HTTP errors
+        data = response.json()
+
+        if data.get("status") == "1":
+            return data.get("result") or []
+        if data.get("message") == NO_RECORDS_MESSAGE:
+            return []
+        if attempt < LOGS_MAX_RETRIES:
+            log_info(f"Etherscan log request failed ({data.get('message')}: {data.get('result')}), retrying...")
+            time.sleep(LOGS_REQUEST_DELAY * 2 ** (attempt + 1))
+
+    raise RuntimeError(f"Etherscan log request failed after {LOGS_MAX_RETRIES} retries: {data.get('message')}: {data.get('result')}")
+
+def fetch_topic_logs(api_key, topic, from_block=0):
+    """
+    Fetches every log with the given topic0 from the CryptoPunks market contract.
+    Pages through results and restarts the query from the last block seen when the page limit is hit.
+    """
+    logs = {}
+    while True:
+        last_block = None
+        for page in range(1, LOGS_MAX_PAGES + 1):
+            url = (
+                f"https://api.etherscan.io/api?module=logs&action=getLogs&address={CONTRACT_ADDRESS}"
+                f"&fromBlock={from_block}&toBlock=latest&topic0={topic}"
+                f"&page={page}&offset={LOGS_PAGE_SIZE}&apikey={api_key}"
+            )
+            result = fetch_logs_page(url)
+            time.sleep(LOGS_REQUEST_DELAY)  # Stay under the API rate limit
+
+            for log in result:
+                # Restarting from the last block returns some logs twice
+                logs[(log["transactionHash"], log["logIndex"])] = log
+            if result:
+                last_block = int(result[-1]["blockNumber"], 16)
+            if len(result) < LOGS_PAGE_SIZE:
+                return list(logs.values())
+
+        if last_block is None or last_block == from_block:
+            raise RuntimeError(f"More than {LOGS_PAGE_SIZE * LOGS_MAX_PAGES} logs in block {from_block}; cannot page further.")
+        from_block = last_block
+
+@instrument("fetch_market_logs")
+def fetch_market_logs():
     """
-    Saves data to a JSON file in the raw data directory.
+    Fetches sale, bid and offer events of the CryptoPunks market contract from the Etherscan API.
+    """
+    # Get the API key from the environment variable
+    API_KEY = os.getenv("ETHERSCAN_API_KEY")
+    if not API_KEY:
+        raise ValueError("Etherscan API key not found in .env file. Please add ETHERSCAN_API_KEY=YourApiKeyToken to .env.")
+
+    log_info("Fetching market event logs from Etherscan API...")
+
+    try:
+        logs = []
+        for topic in MARKET_EVENT_TOPICS:
+            logs.extend(fetch_topic_logs(API_KEY, topic))
+        log_info(f"Market event logs fetched successfully! Number of logs: {len(logs)}")
+        return logs
+
+    except requests.exceptions.RequestException as e:
+        log_error(f"HTTP request failed: {e}")
+    except json.JSONDecodeError as e:
+        log_error(f"Failed to parse JSON response: {e}")
+    except Exception as e:
+        log_error(f"An unexpected error occurred: {e}")
+
+def save_data(data, filename, directory=None):
+    """
+    Saves data to a JSON file in the raw data directory (or the given directory).
     Overwrites the file if it already exists.
     """
+    directory = directory or RAW_DATA_DIR
     try:
         # Ensure the raw data directory exists
-        ensure_directory_exists(RAW_DATA_DIR)
+        ensure_directory_exists(directory)
 
         # Construct the full file path
-        file_path = os.path.join(RAW_DATA_DIR, filename)
+        file_path = os.path.join(directory, filename)
         print(f"Saving data to: {file_path}")  # Debugging statement
 
         # Save the data to a JSON file (overwrite if exists)
@@ -115,7 +209,7 @@ def save_data(data, filename):
 
 def fetch_cryptopunks_transfers():
     """
-    Fetches CryptoPunks transfer data from Etherscan and ETH price data from CoinGecko.
+    Fetches CryptoPunks transfer and market event data from Etherscan and ETH price data from CoinGecko.
     Overwrites existing data in the raw data directory.
     """
     print("Starting data fetch process...")  # Debugging statement
@@ -127,6 +221,13 @@ def fetch_cryptopunks_transfers():
     else:
         print("No Etherscan data fetched. Skipping save.")
 
+    # Fetch market events from Etherscan
+    market_logs = fetch_market_logs()
+    if market_logs:
+        save_data(market_logs, "cryptopunks_market_logs.json")
+    else:
+        log_info("No market event logs fetched. Skipping save.")
+
     # Fetch data from CoinGecko
     coingecko_data = fetch_coingecko_data()
     if coingecko_data:
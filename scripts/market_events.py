@@ -0,0 +1,156 @@
+# scripts/market_events.py
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+from scripts.utils import instrument, log_info
+
+# Constants
+# topic0 (keccak-256 of the event signature) of the CryptoPunks market events we decode
+PUNK_BOUGHT_TOPIC = "0x58e5d5a525e3b40bc15abaa38b5882678db1ee68befd2f60bafe3a7fd06db9e3"  # PunkBought(uint256,uint256,address,address)
+PUNK_BID_ENTERED_TOPIC = "0x5b859394fabae0c1ba88baffe67e751ab5248d2e879028b8c8d6897b0519f56a"  # PunkBidEntered(uint256,uint256,address)
+PUNK_OFFERED_TOPIC = "0x3c7b682d5da98001a9b8cbda6c647d2c63d698a4184fd1d55e2ce7b66f5d21eb"  # PunkOffered(uint256,uint256,address)
+MARKET_EVENT_TOPICS = {
+    PUNK_BOUGHT_TOPIC: "sale",
+    PUNK_BID_ENTERED_TOPIC: "bid",
+    PUNK_OFFERED_TOPIC: "offer",
+}
+ZERO_ADDRESS = "0x" + "0" * 40
+DECODE_BATCH_SIZE = 100_000  # Logs decoded per vectorized batch
+LOG_INDEX_SCALE = 100_000  # Room for log indexes when ordering events by (block, log index)
+
+# Lookup table from ASCII hex digit to its value
+_HEX_DIGITS = np.zeros(256, dtype=np.uint8)
+for _i, _c in enumerate("0123456789abcdef"):
+    _HEX_DIGITS[ord(_c)] = _i
+    _HEX_DIGITS[ord(_c.upper())] = _i
+
+def hex_nibbles(hex_strings, width=64):
+    """
+    Converts a Series of 0x-prefixed hex strings into an (n, width) array of hex digit values.
+    Shorter strings are left-padded with zeros; longer ones keep their last `width` digits.
+    """
+    digits = hex_strings.fillna("0x").str.slice(2).str.zfill(width).str.slice(-width)
+    buffer = np.frombuffer("".join(digits).encode("ascii"), dtype=np.uint8)
+    return _HEX_DIGITS[buffer].reshape(-1, width)
+
+def hex_to_int(hex_strings):
+    """
+    Decodes hex strings that fit in 60 bits (block numbers, timestamps, indexes) to int64.
+    """
+    nibbles = hex_nibbles(hex_strings, width=15).astype(np.int64)
+    return nibbles @ (16 ** np.arange(14, -1, -1, dtype=np.int64))
+
+def hex_to_float(hex_strings):
+    """
+    Decodes uint256 hex words to float64; used for wei amounts, which overflow int64.
+    """
+    nibbles = hex_nibbles(hex_strings, width=64).astype(np.float64)
+    return nibbles @ (16.0 ** np.arange(63, -1, -1))
+
+def topic_address(topics):
+    """
+    Extracts the address from 32-byte indexed topics.
+    """
+    return "0x" + topics.fillna(ZERO_ADDRESS).str.slice(-40).str.lower()
+
+def _decode_batch(logs):
+    df = pd.DataFrame(logs)
+    topics = df["topics"]
+
+    events = pd.DataFrame({
+        "event": topics.str.get(0).str.lower().map(MARKET_EVENT_TOPICS),
+        "hash": df["transactionHash"],
+        "blockNumber": hex_to_int(df["blockNumber"]),
+        "logIndex": hex_to_int(df["logIndex"]),
+        "timeStamp": pd.to_datetime(hex_to_int(df["timeStamp"]), unit="s"),
+        "punkIndex": hex_to_int(topics.str.get(1)),
+        # Every decoded event carries the amount (price, bid or minimum price) in its first data word
+        "value": hex_to_float(df["data"].str.slice(0, 66)) / 1e18,
+    })
+    topic2 = topic_address(topics.str.get(2))
+    topic3 = topic_address(topics.str.get(3))
+
+    # PunkBought(punkIndex, value, from, to), PunkBidEntered(punkIndex, value, from), PunkOffered(punkIndex, minValue, to)
+    events["from_address"] = np.where(events["event"] == "offer", ZERO_ADDRESS, topic2)
+    events["to_address"] = np.select(
+        [events["event"] == "sale", events["event"] == "offer"],
+        [topic3, topic2],
+        default=ZERO_ADDRESS
+    )
+    return events.dropna(subset=["event"])
+
+@instrument()
+def decode_market_logs(logs, batch_size=DECODE_BATCH_SIZE):
+    """
+    Decodes raw Etherscan logs of the CryptoPunks market contract into sale, bid and offer events.
+    Logs with other topics are dropped.
+    """
+    log_info(f"Decoding {len(logs)} market event logs...")
+    batches = [_decode_batch(logs[start:start + batch_size]) for start in range(0, len(logs), batch_size)]
+    if not batches:
+        return pd.DataFrame(columns=["event", "hash", "blockNumber", "logIndex", "timeStamp", "punkIndex", "value", "from_address", "to_address", "ordinal"])
+
+    events = pd.concat(batches, ignore_index=True)
+    events["ordinal"] = events["blockNumber"] * LOG_INDEX_SCALE + events["logIndex"]
+    events = events.sort_values("ordinal", kind="stable").reset_index(drop=True)
+    log_info(f"Decoded {len(events)} market events")
+    return events
+
+def _hash_index(transfers, column):
+    """
+    Returns a Series of `column` indexed by transaction hash, keeping the last transfer of each transaction.
+    """
+    by_hash = transfers.drop_duplicates("hash", keep="last")
+    return pd.Series(by_hash[column].to_numpy(), index=pd.Index(by_hash["hash"].str.lower()))
+
+@instrument()
+def build_sales_table(events, transfers):
+    """
+    Builds one row per sale with its real price in ETH, joined to the transfers by transaction hash.
+    """
+    sales = events[events["event"] == "sale"].copy()
+    bids = events[events["event"] == "bid"][["ordinal", "punkIndex", "value"]].rename(columns={"value": "bid_value"})
+
+    # acceptBidForPunk clears the bid before emitting PunkBought, so accepted bids log a zero price and buyer.
+    # The price is the punk's last bid before the sale and the buyer is the receiver of the sale's transfer.
+    sales = pd.merge_asof(
+        sales.sort_values("ordinal"),
+        bids.sort_values("ordinal"),
+        on="ordinal",
+        by="punkIndex",
+        direction="backward",
+        allow_exact_matches=False
+    )
+    accepted_bid = (sales["value"] == 0) & (sales["to_address"] == ZERO_ADDRESS)
+    sales["sale_type"] = np.where(accepted_bid, "bid", "offer")
+    sales.loc[accepted_bid, "value"] = sales.loc[accepted_bid, "bid_value"]
+
+    sale_hashes = sales["hash"].str.lower()
+    receivers = sale_hashes.map(_hash_index(transfers, "receiver"))
+    sales.loc[accepted_bid, "to_address"] = receivers[accepted_bid]
+    if "usd" in transfers:
+        sales["value_usd"] = sales["value"] * sale_hashes.map(_hash_index(transfers, "usd"))
+
+    sales = sales.rename(columns={"from_address": "sender", "to_address": "receiver"})
+    sales["date"] = sales["timeStamp"].dt.date
+    columns = ["hash", "blockNumber", "logIndex", "timeStamp", "date", "punkIndex", "sender", "receiver", "value", "sale_type"]
+    if "value_usd" in sales:
+        columns.append("value_usd")
+    return sales[columns].reset_index(drop=True)
+
+@instrument()
+def classify_transfers(transfers, sales):
+    """
+    Marks which transfers are sales and attaches the sale price in ETH.
+    """
+    classified = transfers.copy()
+    sale_values = sales.groupby(sales["hash"].str.lower())["value"].sum()
+    transfer_hashes = classified["hash"].str.lower()
+    classified["is_sale"] = transfer_hashes.isin(sale_values.index)
+    classified["sale_value"] = transfer_hashes.map(sale_values)
+    return classified
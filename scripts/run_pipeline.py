@@ -0,0 +1,341 @@
+# scripts/run_pipeline.py
+import os
+import sys
+import json
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+from scripts import fetch_cryptopunks_data as fetch
+from scripts import clean_cryptopunks_data as clean
+from scripts import analyze_cryptopunks_data as analyze
+from scripts import column_store
+from scripts import market_events
+from scripts import sql_store
+from scripts.utils import log_info, log_error, stage_span
+
+# Constants
+DEFAULT_DATA_DIR = os.getenv("CRYPTOPUNKS_DATA_DIR", os.path.join(PROJECT_ROOT, "data"))
+STATE_FILE = ".pipeline_state.json"  # Input hashes of the last successful run of each stage
+HASH_CHUNK_SIZE = 1024 * 1024
+
+RAW_TRANSFERS = "raw/cryptopunks_transfers.json"
+RAW_PRICES = "raw/eth_price_data.json"
+RAW_MARKET_LOGS = "raw/cryptopunks_market_logs.json"
+CLEAN_TRANSFERS = "interim/transfers_clean.pkl"
+CLEAN_PRICES = "interim/eth_price_clean.pkl"
+MARKET_EVENTS = "interim/market_events.pkl"
+PROCESSED_TRANSFERS = "processed/cryptopunks_transfers_cleaned.csv"
+PROCESSED_SALES = "processed/cryptopunks_sales.csv"
+SQL_STORE = "processed/cryptopunks.sqlite"
+COLUMN_STORE_MANIFEST = f"processed/column_store/{column_store.MANIFEST_FILE}"
+ANALYSIS_DIR = "processed/analysis"
+SUMMARY = f"{ANALYSIS_DIR}/summary.json"
+
+def file_hash(path):
+    """
+    Returns the SHA-256 hex digest of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class Stage:
+    """
+    A pipeline step. Inputs and outputs are paths relative to the data directory;
+    a stage depends on whichever stages produce its inputs.
+    """
+    def __init__(self, name, func, inputs=(), outputs=()):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+class Pipeline:
+    """
+    Runs stages as a DAG, in parallel where possible, skipping stages whose inputs are unchanged.
+    """
+    def __init__(self, stages, data_dir=DEFAULT_DATA_DIR, max_workers=4):
+        self.stages = {stage.name: stage for stage in stages}
+        self.data_dir = data_dir
+        self.max_workers = max_workers
+        self.state_path = os.path.join(data_dir, STATE_FILE)
+        self.state = self._load_state()
+        self._lock = threading.Lock()
+        self._frames = {}
+
+        producers = {output: stage.name for stage in stages for output in stage.outputs}
+        self.dependencies = {
+            stage.name: {producers[i] for i in stage.inputs if i in producers}
+            for stage in stages
+        }
+
+    def path(self, relative_path):
+        return os.path.join(self.data_dir, *relative_path.split("/"))
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, "r") as f:
+            return json.load(f)
+
+    def _save_state(self):
+        with open(self.state_path, "w") as f:
+            json.dump(self.state, f, indent=4)
+
+    def load_frame(self, relative_path):
+        """
+        Loads a processed CSV once per run and shares it between analysis stages.
+        """
+        with self._lock:
+            if relative_path not in self._frames:
+                df = pd.read_csv(self.path(relative_path))
+                df["timeStamp"] = pd.to_datetime(df["timeStamp"])
+                df["date"] = df["timeStamp"].dt.date
+                self._frames[relative_path] = df
+        return self._frames[relative_path]
+
+    def save_frame(self, df, relative_path):
+        path = self.path(relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if path.endswith(".pkl"):
+            df.to_pickle(path)
+        else:
+            df.to_csv(path, index=False)
+
+    def is_up_to_date(self, stage, input_hashes, refresh=False):
+        if not all(os.path.exists(self.path(output)) for output in stage.outputs):
+            return False
+        if not stage.inputs:
+            # Source stages (API fetches) only re-run when asked to
+            return not refresh
+        return self.state.get(stage.name) == input_hashes
+
+    def run_stage(self, stage, refresh=False, force=False):
+        missing = [i for i in stage.inputs if not os.path.exists(self.path(i))]
+        if missing:
+            raise FileNotFoundError(f"Stage {stage.name} is missing inputs: {', '.join(missing)}")
+
+        input_hashes = {i: file_hash(self.path(i)) for i in stage.inputs}
+        if not force and self.is_up_to_date(stage, input_hashes, refresh):
+            log_info(f"Skipping {stage.name}: inputs unchanged")
+            return False
+
+        log_info(f"Running {stage.name}...")
+        with stage_span(f"pipeline.{stage.name}"):
+            stage.func(self)
+
+        missing = [o for o in stage.outputs if not os.path.exists(self.path(o))]
+        if missing:
+            raise RuntimeError(f"Stage {stage.name} did not produce: {', '.join(missing)}")
+
+        with self._lock:
+            self.state[stage.name] = input_hashes
+            self._save_state()
+        return True
+
+    def run(self, refresh=False, force=False):
+        """
+        Runs every stage once its dependencies have finished.
+        Returns the names of the stages that actually ran.
+        """
+        pending = dict(self.stages)
+        finished = set()
+        ran = []
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    if self.dependencies[name] <= finished:
+                        stage = pending.pop(name)
+                        running[pool.submit(self.run_stage, stage, refresh, force)] = name
+
+                if not running:
+                    raise ValueError(f"Pipeline has a dependency cycle between: {', '.join(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        if future.result():
+                            ran.append(name)
+                    except Exception as e:
+                        log_error(f"Stage {name} failed: {e}")
+                        pending.clear()
+                        raise
+                    finished.add(name)
+
+        return ran
+
+# Stage implementations
+
+def fetch_transfers(pipeline):
+    data = fetch.fetch_etherscan_data()
+    if not data:
+        raise RuntimeError("No Etherscan data fetched.")
+    fetch.save_data(data, os.path.basename(RAW_TRANSFERS), os.path.dirname(pipeline.path(RAW_TRANSFERS)))
+
+def fetch_prices(pipeline):
+    data = fetch.fetch_coingecko_data()
+    if not data:
+        raise RuntimeError("No CoinGecko data fetched.")
+    fetch.save_data(data, os.path.basename(RAW_PRICES), os.path.dirname(pipeline.path(RAW_PRICES)))
+
+def fetch_market_logs(pipeline):
+    data = fetch.fetch_market_logs()
+    if data is None:
+        raise RuntimeError("No market event logs fetched.")
+    fetch.save_data(data, os.path.basename(RAW_MARKET_LOGS), os.path.dirname(pipeline.path(RAW_MARKET_LOGS)))
+
+def clean_transfers(pipeline):
+    data = clean.load_json_data(os.path.basename(RAW_TRANSFERS), os.path.dirname(pipeline.path(RAW_TRANSFERS)))
+    pipeline.save_frame(clean.clean_etherscan_data(data), CLEAN_TRANSFERS)
+
+def clean_prices(pipeline):
+    data = clean.load_json_data(os.path.basename(RAW_PRICES), os.path.dirname(pipeline.path(RAW_PRICES)))
+    pipeline.save_frame(clean.clean_coingecko_data(data), CLEAN_PRICES)
+
+def merge(pipeline):
+    etherscan_df = pd.read_pickle(pipeline.path(CLEAN_TRANSFERS))
+    coingecko_df = pd.read_pickle(pipeline.path(CLEAN_PRICES))
+    merged_df = clean.merge_data(etherscan_df, coingecko_df)
+    pipeline.save_frame(merged_df, PROCESSED_TRANSFERS)
+
+def decode_market_events(pipeline):
+    logs = clean.load_json_data(os.path.basename(RAW_MARKET_LOGS), os.path.dirname(pipeline.path(RAW_MARKET_LOGS)))
+    pipeline.save_frame(market_events.decode_market_logs(logs), MARKET_EVENTS)
+
+def build_sales(pipeline):
+    events = pd.read_pickle(pipeline.path(MARKET_EVENTS))
+    sales = market_events.build_sales_table(events, pipeline.load_frame(PROCESSED_TRANSFERS))
+    pipeline.save_frame(sales, PROCESSED_SALES)
+
+def build_column_store(pipeline):
+    df = pd.read_csv(pipeline.path(PROCESSED_TRANSFERS), usecols=["blockNumber", "timeStamp", "value", "sender", "receiver"])
+    column_store.write_column_store(
+        df,
+        os.path.dirname(pipeline.path(COLUMN_STORE_MANIFEST)),
+        source=pipeline.path(PROCESSED_TRANSFERS)
+    )
+
+def load_sql_store(pipeline):
+    sql_store.load_into_sql_store(
+        transfers=pipeline.load_frame(PROCESSED_TRANSFERS),
+        sales=pipeline.load_frame(PROCESSED_SALES),
+        path=pipeline.path(SQL_STORE)
+    )
+
+def analyze_holders(pipeline):
+    pipeline.save_frame(analyze.analyze_holders(pipeline.load_frame(PROCESSED_TRANSFERS)), f"{ANALYSIS_DIR}/holder_stats.csv")
+
+def analyze_liquidity(pipeline):
+    pipeline.save_frame(analyze.analyze_liquidity(pipeline.load_frame(PROCESSED_SALES)), f"{ANALYSIS_DIR}/liquidity.csv")
+
+def analyze_market_impact(pipeline):
+    whale_trades, price_impact = analyze.analyze_market_impact(pipeline.load_frame(PROCESSED_SALES))
+    pipeline.save_frame(whale_trades, f"{ANALYSIS_DIR}/whale_trades.csv")
+    pipeline.save_frame(price_impact, f"{ANALYSIS_DIR}/price_impact.csv")
+
+def detect_anomalies(pipeline):
+    pipeline.save_frame(analyze.detect_anomalies(pipeline.load_frame(PROCESSED_SALES)), f"{ANALYSIS_DIR}/anomalies.csv")
+
+def rollup(pipeline):
+    """
+    Summarizes the analysis outputs into a single JSON file.
+    Trading metrics come from the sales; holder metrics come from all transfers.
+    """
+    transfers = market_events.classify_transfers(
+        pipeline.load_frame(PROCESSED_TRANSFERS),
+        pipeline.load_frame(PROCESSED_SALES)
+    )
+    holder_stats = pd.read_csv(pipeline.path(f"{ANALYSIS_DIR}/holder_stats.csv"))
+    liquidity = pd.read_csv(pipeline.path(f"{ANALYSIS_DIR}/liquidity.csv"))
+    whale_trades = pd.read_csv(pipeline.path(f"{ANALYSIS_DIR}/whale_trades.csv"))
+    anomalies = pd.read_csv(pipeline.path(f"{ANALYSIS_DIR}/anomalies.csv"))
+
+    summary = {
+        "holders": int(len(holder_stats)),
+        "holder_types": holder_stats["holder_type"].value_counts().to_dict(),
+        "transfers": int(len(transfers)),
+        "sale_transfers": int(transfers["is_sale"].sum()),
+        "trading_days": int(len(liquidity)),
+        "sales": int(liquidity["transaction_count"].sum()),
+        "total_volume": float(liquidity["value"].sum()),
+        "first_date": str(liquidity["date"].min()) if len(liquidity) else None,
+        "last_date": str(liquidity["date"].max()) if len(liquidity) else None,
+        "whale_trades": int(len(whale_trades)),
+        "anomalies": int(len(anomalies)),
+    }
+
+    with open(pipeline.path(SUMMARY), "w") as f:
+        json.dump(summary, f, indent=4)
+
+def build_stages():
+    """
+    Returns the fetch -> clean -> merge -> column store / sales -> SQL store / analyze -> rollup stages.
+    Holders are analyzed over all transfers; liquidity, market impact and anomalies over real sale prices.
+    """
+    analysis_outputs = {
+        "analyze_holders": [f"{ANALYSIS_DIR}/holder_stats.csv"],
+        "analyze_liquidity": [f"{ANALYSIS_DIR}/liquidity.csv"],
+        "analyze_market_impact": [f"{ANALYSIS_DIR}/whale_trades.csv", f"{ANALYSIS_DIR}/price_impact.csv"],
+        "detect_anomalies": [f"{ANALYSIS_DIR}/anomalies.csv"],
+    }
+    analysis_funcs = {
+        "analyze_holders": analyze_holders,
+        "analyze_liquidity": analyze_liquidity,
+        "analyze_market_impact": analyze_market_impact,
+        "detect_anomalies": detect_anomalies,
+    }
+    analysis_inputs = {
+        "analyze_holders": [PROCESSED_TRANSFERS],
+        "analyze_liquidity": [PROCESSED_SALES],
+        "analyze_market_impact": [PROCESSED_SALES],
+        "detect_anomalies": [PROCESSED_SALES],
+    }
+
+    stages = [
+        Stage("fetch_transfers", fetch_transfers, outputs=[RAW_TRANSFERS]),
+        Stage("fetch_prices", fetch_prices, outputs=[RAW_PRICES]),
+        Stage("fetch_market_logs", fetch_market_logs, outputs=[RAW_MARKET_LOGS]),
+        Stage("clean_transfers", clean_transfers, inputs=[RAW_TRANSFERS], outputs=[CLEAN_TRANSFERS]),
+        Stage("clean_prices", clean_prices, inputs=[RAW_PRICES], outputs=[CLEAN_PRICES]),
+        Stage("decode_market_events", decode_market_events, inputs=[RAW_MARKET_LOGS], outputs=[MARKET_EVENTS]),
+        Stage("merge", merge, inputs=[CLEAN_TRANSFERS, CLEAN_PRICES], outputs=[PROCESSED_TRANSFERS]),
+        Stage("column_store", build_column_store, inputs=[PROCESSED_TRANSFERS], outputs=[COLUMN_STORE_MANIFEST]),
+        Stage("sales", build_sales, inputs=[MARKET_EVENTS, PROCESSED_TRANSFERS], outputs=[PROCESSED_SALES]),
+        Stage("sql_store", load_sql_store, inputs=[PROCESSED_TRANSFERS, PROCESSED_SALES], outputs=[SQL_STORE]),
+    ]
+    for name, func in analysis_funcs.items():
+        stages.append(Stage(name, func, inputs=analysis_inputs[name], outputs=analysis_outputs[name]))
+    stages.append(Stage(
+        "rollup",
+        rollup,
+        inputs=[PROCESSED_TRANSFERS, PROCESSED_SALES] + [output for outputs in analysis_outputs.values() for output in outputs],
+        outputs=[SUMMARY]
+    ))
+    return stages
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the CryptoPunks data pipeline.")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Root directory for raw, interim and processed data")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum number of stages to run at the same time")
+    parser.add_argument("--refresh", action="store_true", help="Re-fetch raw data from the APIs")
+    parser.add_argument("--force", action="store_true", help="Re-run every stage even if its inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline(build_stages(), data_dir=args.data_dir, max_workers=args.workers)
+    ran = pipeline.run(refresh=args.refresh, force=args.force)
+    log_info(f"Pipeline completed. Stages run: {', '.join(ran) if ran else 'none'}")
+
+# Run the pipeline
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# scripts/sql_store.py
+import os
+import sys
+import sqlite3
+import pandas as pd
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+from scripts.utils import instrument, log_info
+
+# Constants
+DATA_DIR = os.getenv("CRYPTOPUNKS_DATA_DIR", os.path.join(PROJECT_ROOT, "data"))  # Root of the data directory
+PROCESSED_DATA_DIR = os.path.join(DATA_DIR, "processed")  # Path to processed data
+SQL_STORE_PATH = os.path.join(PROCESSED_DATA_DIR, "cryptopunks.sqlite")  # Path to the SQLite database
+LOAD_BATCH_SIZE = 50_000  # Rows inserted per executemany call
+
+# Table name -> column definitions; timeStamp is seconds since the epoch, date is YYYY-MM-DD
+TABLES = {
+    "transfers": {
+        "hash": "TEXT",
+        "blockNumber": "INTEGER",
+        "timeStamp": "INTEGER",
+        "date": "TEXT",
+        "sender": "TEXT",
+        "receiver": "TEXT",
+        "value": "REAL",
+        "value_usd": "REAL",
+    },
+    "sales": {
+        "hash": "TEXT",
+        "blockNumber": "INTEGER",
+        "logIndex": "INTEGER",
+        "timeStamp": "INTEGER",
+        "date": "TEXT",
+        "punkIndex": "INTEGER",
+        "sender": "TEXT",
+        "receiver": "TEXT",
+        "value": "REAL",
+        "sale_type": "TEXT",
+    },
+}
+INDEXED_COLUMNS = ["blockNumber", "timeStamp", "sender", "receiver"]
+
+def open_sql_store(path=None):
+    """
+    Opens (and creates if needed) the SQLite database holding transfers and sales.
+    """
+    path = path or SQL_STORE_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for table, columns in TABLES.items():
+        column_defs = ", ".join(f"{name} {sql_type}" for name, sql_type in columns.items())
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({column_defs})")
+    return conn
+
+def create_indexes(conn):
+    """
+    Creates the block number, timestamp, sender and receiver indexes on every table.
+    """
+    for table in TABLES:
+        for column in INDEXED_COLUMNS:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+    conn.commit()
+
+def _to_rows(df, table):
+    """
+    Converts a transfers or sales DataFrame to tuples in the table's column order.
+    """
+    rows = pd.DataFrame(index=df.index)
+    timestamps = pd.to_datetime(df["timeStamp"])
+    for name in TABLES[table]:
+        if name == "timeStamp":
+            rows[name] = (timestamps - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+        elif name == "date":
+            rows[name] = timestamps.dt.strftime("%Y-%m-%d")
+        elif name in df:
+            rows[name] = df[name]
+        else:
+            rows[name] = None
+    rows = rows.astype(object).where(rows.notna(), None)
+    return list(rows.itertuples(index=False, name=None))
+
+@instrument()
+def bulk_load(conn, df, table, batch_size=LOAD_BATCH_SIZE):
+    """
+    Appends rows newer than the highest stored block, in batches inside one transaction.
+    The table is append-only: rows at or below the highest stored block are skipped.
+    Returns the number of rows inserted.
+    """
+    last_block = conn.execute(f"SELECT MAX(blockNumber) FROM {table}").fetchone()[0]
+    if last_block is not None:
+        df = df[df["blockNumber"] > last_block]
+    if df.empty:
+        return 0
+
+    placeholders = ", ".join("?" for _ in TABLES[table])
+    insert = f"INSERT INTO {table} ({', '.join(TABLES[table])}) VALUES ({placeholders})"
+    with conn:
+        for start in range(0, len(df), batch_size):
+            conn.executemany(insert, _to_rows(df.iloc[start:start + batch_size], table))
+
+    # Building indexes after the first load is faster than maintaining them row by row
+    create_indexes(conn)
+    return len(df)
+
+def load_into_sql_store(transfers=None, sales=None, path=None):
+    """
+    Bulk-loads transfers and/or sales into the SQL store.
+    """
+    conn = open_sql_store(path)
+    try:
+        if transfers is not None:
+            log_info(f"Loaded {bulk_load(conn, transfers, 'transfers')} new transfers into the SQL store")
+        if sales is not None:
+            log_info(f"Loaded {bulk_load(conn, sales, 'sales')} new sales into the SQL store")
+    finally:
+        conn.close()
+
+def time_range(start=None, end=None):
+    """
+    Builds a timeStamp range condition that can use the timestamp index.
+    `start` is inclusive and `end` exclusive; both accept anything pd.Timestamp does.
+    """
+    conditions, params = [], []
+    if start is not None:
+        conditions.append("timeStamp >= ?")
+        params.append(int(pd.Timestamp(start).timestamp()))
+    if end is not None:
+        conditions.append("timeStamp < ?")
+        params.append(int(pd.Timestamp(end).timestamp()))
+    return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+def query(conn, sql, params=()):
+    """
+    Runs a query and returns the result as a DataFrame.
+    """
+    return pd.read_sql_query(sql, conn, params=list(params))
+
+def transfers_for_address(conn, address, table="transfers"):
+    """
+    Returns every row an address sent or received, using the sender and receiver indexes.
+    """
+    return query(
+        conn,
+        f"SELECT * FROM {table} WHERE sender = ? OR receiver = ? ORDER BY timeStamp",
+        (address.lower(), address.lower())
+    )
+
+def daily_volume(conn, start=None, end=None, table="sales"):
+    """
+    Returns value and transaction count per day, using the timestamp index for the range.
+    Rows without a value are not counted, matching pandas' groupby count.
+    """
+    where, params = time_range(start, end)
+    return query(
+        conn,
+        f"SELECT date, SUM(value) AS value, COUNT(value) AS transaction_count FROM {table}{where} GROUP BY date ORDER BY date",
+        params
+    )
@@ -1,10 +1,221 @@
 # scripts/utils.py
+import os
+import sys
+import json
+import time
 import logging
+import threading
+import functools
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Telemetry settings (read once at import so the disabled path stays cheap)
+# CRYPTOPUNKS_TELEMETRY: path of the sink file; ".prom" writes Prometheus text, anything else JSON lines
+# CRYPTOPUNKS_PROFILE: set to a number of seconds; stages slower than that get their sampled profile logged
+TELEMETRY_PATH = os.getenv("CRYPTOPUNKS_TELEMETRY")
+PROFILE_THRESHOLD = float(os.getenv("CRYPTOPUNKS_PROFILE") or 0)
+PROFILE_INTERVAL = 0.005  # Seconds between profiler samples
+PROMETHEUS_METRICS = ["wall_seconds", "cpu_seconds", "rows_in", "rows_out", "rss_start_mb", "rss_end_mb", "peak_rss_mb"]
+
+_sink_lock = threading.Lock()
+_prometheus_samples = None  # (metric, stage) -> latest value, loaded from the sink on first write
+
 def log_info(message):
     logging.info(message)
 
 def log_error(message):
-    logging.error(message)
\ No newline at end of file
+    logging.error(message)
+
+def telemetry_enabled():
+    return bool(TELEMETRY_PATH) or PROFILE_THRESHOLD > 0
+
+def count_rows(obj):
+    """
+    Returns the number of rows in a DataFrame, list, or a tuple/dict of them.
+    Returns None when the object has no meaningful row count.
+    """
+    if obj is None or isinstance(obj, (str, bytes)):
+        return None
+    if isinstance(obj, (tuple, list)) and obj and all(hasattr(item, "shape") for item in obj):
+        return sum(len(item) for item in obj)
+    if isinstance(obj, dict):
+        counts = [count_rows(item) for item in obj.values()]
+        counts = [c for c in counts if c is not None]
+        return sum(counts) if counts else None
+    if hasattr(obj, "__len__"):
+        return len(obj)
+    return None
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of this process in MB, or None if unavailable.
+    This is the high-water mark over the whole process lifetime, not per stage.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def current_rss_mb():
+    """
+    Returns the current resident set size of this process in MB, or None if unavailable (non-Linux).
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread at a fixed interval and counts the leaf frames.
+    """
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                code = frame.f_code
+                self.samples[f"{code.co_filename}:{frame.f_lineno} ({code.co_name})"] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def top(self, n=10):
+        return self.samples.most_common(n)
+
+def _read_prometheus_samples(path):
+    """
+    Reads the samples of a sink file written by write_prometheus_metrics.
+    """
+    samples = {}
+    if not os.path.exists(path):
+        return samples
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("#") or '{stage="' not in line:
+                continue
+            series, value = line.rsplit(" ", 1)
+            metric, stage = series.split('{stage="', 1)
+            samples[(metric, stage[:-2])] = float(value)
+    return samples
+
+def write_prometheus_metrics(record):
+    """
+    Rewrites the Prometheus text sink with the latest value of every metric for every stage.
+    The file is replaced atomically, so collectors never see a partial write or duplicate series.
+    """
+    global _prometheus_samples
+    if _prometheus_samples is None:
+        _prometheus_samples = _read_prometheus_samples(TELEMETRY_PATH)
+
+    stage = record["stage"].replace("\\", "\\\\").replace('"', '\\"')
+    for key in PROMETHEUS_METRICS:
+        if isinstance(record.get(key), (int, float)):
+            _prometheus_samples[(f"cryptopunks_stage_{key}", stage)] = record[key]
+
+    lines = []
+    for metric in sorted({metric for metric, _ in _prometheus_samples}):
+        lines.append(f"# TYPE {metric} gauge")
+        for (sample_metric, sample_stage), value in sorted(_prometheus_samples.items()):
+            if sample_metric == metric:
+                lines.append(f'{metric}{{stage="{sample_stage}"}} {float(value)}')
+
+    temp_path = f"{TELEMETRY_PATH}.tmp"
+    with open(temp_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(temp_path, TELEMETRY_PATH)
+
+def write_metrics(record):
+    """
+    Writes one stage record to the telemetry sink.
+    """
+    if not TELEMETRY_PATH:
+        return
+    with _sink_lock:
+        if TELEMETRY_PATH.endswith(".prom"):
+            write_prometheus_metrics(record)
+        else:
+            with open(TELEMETRY_PATH, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+@contextmanager
+def stage_span(name, rows_in=None):
+    """
+    Times a block of pipeline work and records wall time, CPU time, rows and memory.
+    CPU time is for the calling thread only, so concurrent stages don't count each other's work.
+    Memory is the RSS at the start and end of the span plus the process-wide peak RSS so far.
+    Set span["rows_out"] inside the block to record output rows.
+    """
+    span = {"stage": name, "rows_in": rows_in, "rows_out": None}
+    if not telemetry_enabled():
+        yield span
+        return
+
+    profiler = SamplingProfiler(threading.get_ident()).start() if PROFILE_THRESHOLD > 0 else None
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    rss_start = current_rss_mb()
+    status = "ok"
+    try:
+        yield span
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        wall_seconds = time.perf_counter() - wall_start
+        span.update({
+            "timestamp": time.time(),
+            "status": status,
+            "wall_seconds": round(wall_seconds, 6),
+            "cpu_seconds": round(time.thread_time() - cpu_start, 6),
+            "rss_start_mb": rss_start,
+            "rss_end_mb": current_rss_mb(),
+            "peak_rss_mb": peak_rss_mb(),
+        })
+        if profiler is not None:
+            profiler.stop()
+            if wall_seconds >= PROFILE_THRESHOLD:
+                span["profile"] = profiler.top()
+                log_info(f"Slow stage {name} ({wall_seconds:.2f}s), hottest lines: {span['profile']}")
+        write_metrics(span)
+
+def instrument(name=None):
+    """
+    Decorator that wraps a function in a stage_span.
+    Rows in are taken from the first argument and rows out from the return value.
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not telemetry_enabled():
+                return func(*args, **kwargs)
+            with stage_span(stage_name, rows_in=count_rows(args[0]) if args else None) as span:
+                result = func(*args, **kwargs)
+                span["rows_out"] = count_rows(result)
+            return result
+
+        return wrapper
+    return decorator
@@ -6,4 +6,50 @@ def test_fetch_cryptopunks_transfers():
     api_key = "YourApiKeyToken"
     data = fetch_cryptopunks_transfers(api_key)
     assert data["status"] == "1"
-    assert len(data["result"]) > 0
\ No newline at end of file
+    assert len(data["result"]) > 0
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+def fake_get(responses, urls):
+    def get(url):
+        urls.append(url)
+        return FakeResponse(responses.pop(0))
+    return get
+
+def make_page(start, count):
+    return [{"transactionHash": f"0x{i:064x}", "logIndex": "0x", "blockNumber": hex(i)} for i in range(start, start + count)]
+
+def test_fetch_topic_logs_retries_failed_pages(monkeypatch):
+    from scripts import fetch_cryptopunks_data as fetch
+    monkeypatch.setattr(fetch, "LOGS_PAGE_SIZE", 2)
+    monkeypatch.setattr(fetch.time, "sleep", lambda seconds: None)
+    urls = []
+    responses = [
+        {"status": "1", "message": "OK", "result": make_page(1, 2)},
+        {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"},
+        {"status": "1", "message": "OK", "result": make_page(3, 2)},
+        {"status": "0", "message": "No records found", "result": []},
+    ]
+    monkeypatch.setattr(fetch.requests, "get", fake_get(responses, urls))
+
+    logs = fetch.fetch_topic_logs("key", "0xtopic")
+    # The rate-limited page is retried instead of ending the fetch early
+    assert len(logs) == 4
+    assert [url.split("&page=")[1].split("&")[0] for url in urls] == ["1", "2", "2", "3"]
+
+def test_fetch_topic_logs_raises_after_retries(monkeypatch):
+    from scripts import fetch_cryptopunks_data as fetch
+    monkeypatch.setattr(fetch.time, "sleep", lambda seconds: None)
+    responses = [{"status": "0", "message": "NOTOK", "result": "Invalid API Key"}] * (fetch.LOGS_MAX_RETRIES + 1)
+    monkeypatch.setattr(fetch.requests, "get", fake_get(responses, []))
+
+    with pytest.raises(RuntimeError, match="Invalid API Key"):
+        fetch.fetch_topic_logs("key", "0xtopic")
@@ -0,0 +1,70 @@
+# tests/test_market_events.py
+import pandas as pd
+from scripts.market_events import (
+    PUNK_BOUGHT_TOPIC, PUNK_BID_ENTERED_TOPIC, PUNK_OFFERED_TOPIC,
+    decode_market_logs, build_sales_table, classify_transfers
+)
+
+SELLER = "0x" + "a" * 40
+BUYER = "0x" + "b" * 40
+BIDDER = "0x" + "c" * 40
+ZERO = "0x" + "0" * 40
+
+def word(value):
+    return "0x" + f"{value:064x}"
+
+def address_topic(address):
+    return "0x" + "0" * 24 + address[2:]
+
+def make_log(topic, block, log_index, topics, value):
+    return {
+        "transactionHash": f"0x{block:064x}",
+        "blockNumber": hex(block),
+        "logIndex": hex(log_index) if log_index else "0x",  # Etherscan returns "0x" for zero
+        "timeStamp": hex(1500000000 + block * 86400),
+        "topics": [topic] + topics,
+        "data": word(value),
+    }
+
+def make_logs():
+    return [
+        make_log(PUNK_OFFERED_TOPIC, 10, 1, [word(7), address_topic(ZERO)], 5 * 10**18),
+        make_log(PUNK_BOUGHT_TOPIC, 11, 0, [word(7), address_topic(SELLER), address_topic(BUYER)], 5 * 10**18),
+        make_log(PUNK_BID_ENTERED_TOPIC, 12, 3, [word(7), address_topic(BIDDER)], 12345 * 10**16),
+        # Accepted bid: the contract logs a zero price and zero buyer
+        make_log(PUNK_BOUGHT_TOPIC, 13, 2, [word(7), address_topic(BUYER), address_topic(ZERO)], 0),
+        make_log("0x" + "d" * 64, 14, 0, [word(7)], 0),
+    ]
+
+def make_transfers():
+    return pd.DataFrame({
+        "hash": [f"0x{11:064x}", f"0x{13:064x}", f"0x{20:064x}"],
+        "receiver": [BUYER, BIDDER, SELLER],
+        "usd": [300.0, 400.0, 500.0],
+    })
+
+def test_decode_market_logs_in_batches():
+    events = decode_market_logs(make_logs(), batch_size=2)
+
+    assert list(events["event"]) == ["offer", "sale", "bid", "sale"]
+    assert list(events["punkIndex"]) == [7, 7, 7, 7]
+    assert list(events["logIndex"]) == [1, 0, 3, 2]
+    assert events.loc[1, "from_address"] == SELLER
+    assert events.loc[1, "to_address"] == BUYER
+    assert events.loc[2, "value"] == 123.45
+
+def test_build_sales_table_recovers_accepted_bids():
+    sales = build_sales_table(decode_market_logs(make_logs()), make_transfers())
+
+    assert list(sales["sale_type"]) == ["offer", "bid"]
+    assert list(sales["value"]) == [5.0, 123.45]
+    assert list(sales["receiver"]) == [BUYER, BIDDER]
+    assert list(sales["value_usd"]) == [1500.0, 123.45 * 400.0]
+
+def test_classify_transfers():
+    transfers = make_transfers()
+    sales = build_sales_table(decode_market_logs(make_logs()), transfers)
+    classified = classify_transfers(transfers, sales)
+
+    assert list(classified["is_sale"]) == [True, True, False]
+    assert classified["sale_value"].isna().tolist() == [False, False, True]
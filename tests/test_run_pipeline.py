@@ -0,0 +1,65 @@
+# tests/test_run_pipeline.py
+import json
+import pytest
+from scripts.run_pipeline import Pipeline, Stage, build_stages
+from scripts.market_events import PUNK_BOUGHT_TOPIC
+
+def write_raw_data(data_dir):
+    raw_dir = data_dir / "raw"
+    raw_dir.mkdir(parents=True)
+    transfers = [
+        {
+            "blockNumber": str(3919706 + i),
+            "timeStamp": str(1498251906 + i * 86400),
+            "hash": f"0x{i:064x}",
+            "from": f"0x{i % 3:040x}",
+            "to": f"0x{(i + 1) % 5:040x}",
+            "value": str((i + 1) * 10 ** 18),
+        }
+        for i in range(20)
+    ]
+    prices = {"usd": 300.0, "usd_market_cap": 1.0, "usd_24h_vol": 1.0, "usd_24h_change": 0.0, "last_updated_at": 1498251906}
+    (raw_dir / "cryptopunks_transfers.json").write_text(json.dumps(transfers))
+    market_logs = [
+        {
+            "transactionHash": f"0x{i:064x}",
+            "blockNumber": hex(3919706 + i),
+            "logIndex": "0x",
+            "timeStamp": hex(1498251906 + i * 86400),
+            "topics": [PUNK_BOUGHT_TOPIC, f"0x{i:064x}", f"0x{i % 3:064x}", f"0x{(i + 1) % 5:064x}"],
+            "data": f"0x{(i + 1) * 10 ** 18:064x}",
+        }
+        for i in range(0, 20, 2)
+    ]
+    (raw_dir / "eth_price_data.json").write_text(json.dumps(prices))
+    (raw_dir / "cryptopunks_market_logs.json").write_text(json.dumps(market_logs))
+
+def test_pipeline_skips_unchanged_stages(tmp_path):
+    write_raw_data(tmp_path)
+
+    ran = Pipeline(build_stages(), data_dir=str(tmp_path)).run()
+    assert "fetch_transfers" not in ran
+    assert {"clean_transfers", "merge", "analyze_holders", "rollup"} <= set(ran)
+    summary = json.loads((tmp_path / "processed" / "analysis" / "summary.json").read_text())
+    assert summary["transfers"] == 20
+    assert summary["sales"] == 10
+    assert summary["sale_transfers"] == 10
+    assert (tmp_path / "processed" / "cryptopunks.sqlite").exists()
+
+    assert Pipeline(build_stages(), data_dir=str(tmp_path)).run() == []
+
+    # Changing the prices re-runs the price branch but not the transfer cleaning
+    prices = json.loads((tmp_path / "raw" / "eth_price_data.json").read_text())
+    prices["usd_24h_change"] = 1.0
+    (tmp_path / "raw" / "eth_price_data.json").write_text(json.dumps(prices))
+    ran = Pipeline(build_stages(), data_dir=str(tmp_path)).run()
+    assert "clean_prices" in ran and "merge" in ran
+    assert "clean_transfers" not in ran
+
+def test_pipeline_detects_cycles(tmp_path):
+    stages = [
+        Stage("a", lambda p: None, inputs=["b.txt"], outputs=["a.txt"]),
+        Stage("b", lambda p: None, inputs=["a.txt"], outputs=["b.txt"]),
+    ]
+    with pytest.raises(ValueError):
+        Pipeline(stages, data_dir=str(tmp_path)).run()
@@ -0,0 +1,104 @@
+# tests/test_sql_store.py
+import numpy as np
+import pandas as pd
+from scripts.sql_store import open_sql_store, bulk_load, transfers_for_address, daily_volume
+from scripts.analyze_cryptopunks_data import (
+    analyze_holders, analyze_liquidity, analyze_market_impact, detect_anomalies,
+    analyze_holders_sql, analyze_liquidity_sql, analyze_market_impact_sql, detect_anomalies_sql
+)
+
+def make_transfers(n=200):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "hash": [f"0x{i:064x}" for i in range(n)],
+        "blockNumber": np.arange(n) + 3919706,
+        "timeStamp": pd.to_datetime(1609459200 + np.arange(n) * 21600, unit="s"),
+        "sender": [f"0x{i % 7:040x}" for i in range(n)],
+        "receiver": [f"0x{i % 11:040x}" for i in range(n)],
+        "value": np.where(np.arange(n) == 150, 500.0, rng.lognormal(3, 0.3, n)),
+    }).assign(value=lambda df: df["value"].where(np.arange(n) % 10 != 3))  # Every tenth transfer has no value
+
+def test_bulk_load_is_append_only(tmp_path):
+    conn = open_sql_store(str(tmp_path / "store.sqlite"))
+    df = make_transfers()
+
+    assert bulk_load(conn, df.iloc[:120], "transfers", batch_size=50) == 120
+    assert bulk_load(conn, df, "transfers", batch_size=50) == 80
+    assert bulk_load(conn, df, "transfers") == 0
+    assert conn.execute("SELECT COUNT(*) FROM transfers").fetchone()[0] == 200
+
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM transfers WHERE receiver = ?", ("0x1",)).fetchall()
+    assert "idx_transfers_receiver" in str(plan)
+
+def test_indexed_queries(tmp_path):
+    conn = open_sql_store(str(tmp_path / "store.sqlite"))
+    df = make_transfers()
+    bulk_load(conn, df, "transfers")
+
+    address = f"0x{3:040x}"
+    expected = ((df["sender"] == address) | (df["receiver"] == address)).sum()
+    assert len(transfers_for_address(conn, address)) == expected
+
+    volume = daily_volume(conn, "2021-01-10", "2021-01-20", table="transfers")
+    assert list(volume["date"]) == [f"2021-01-{day}" for day in range(10, 20)]
+    in_range = (df["timeStamp"] >= "2021-01-10") & (df["timeStamp"] < "2021-01-20")
+    assert volume["transaction_count"].sum() == df.loc[in_range, "value"].count() == 36
+
+def test_sql_analysis_matches_pandas(tmp_path):
+    conn = open_sql_store(str(tmp_path / "store.sqlite"))
+    df = make_transfers()
+    bulk_load(conn, df, "transfers")
+    df["date"] = df["timeStamp"].dt.date
+
+    expected = analyze_holders(df).sort_values("receiver").reset_index(drop=True)
+    actual = analyze_holders_sql(conn).sort_values("receiver").reset_index(drop=True)
+    assert np.allclose(actual["value"], expected["value"])
+    assert list(actual["holder_type"].astype(str)) == list(expected["holder_type"].astype(str))
+
+    expected = analyze_liquidity(df)
+    actual = analyze_liquidity_sql(conn, table="transfers")
+    assert list(actual["date"]) == list(expected["date"])
+    assert np.allclose(actual["liquidity_score"], expected["liquidity_score"])
+
+    expected_whales, expected_impact = analyze_market_impact(df)
+    actual_whales, actual_impact = analyze_market_impact_sql(conn, table="transfers")
+    assert len(actual_whales) == len(expected_whales)
+    assert np.allclose(actual_impact["value"].to_numpy(), expected_impact["value"].to_numpy())
+
+    anomalies = detect_anomalies_sql(conn, table="transfers")
+    assert list(anomalies["value"]) == [500.0]
+    assert list(anomalies["hash"]) == list(detect_anomalies(df)["hash"])
+
+def test_market_impact_sql_with_mostly_null_values(tmp_path):
+    conn = open_sql_store(str(tmp_path / "store.sqlite"))
+    df = make_transfers()
+    df["value"] = df["value"].where(np.arange(len(df)) % 20 == 0)  # 95% of transfers have no value
+    bulk_load(conn, df, "transfers")
+    df["date"] = df["timeStamp"].dt.date
+
+    expected_whales, _ = analyze_market_impact(df)
+    actual_whales, _ = analyze_market_impact_sql(conn, table="transfers")
+    assert sorted(actual_whales["value"]) == sorted(expected_whales["value"])
+
+def test_detect_anomalies_sql_is_stable_after_large_values(tmp_path):
+    # Same series as the column store stability test: large early prices, then a long run of small ones
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.lognormal(8, 1, 1000), rng.normal(0.01, 0.001, 20000)])
+    values[[5000, 15000]] = 1.0
+    conn = open_sql_store(str(tmp_path / "store.sqlite"))
+    bulk_load(conn, pd.DataFrame({
+        "blockNumber": np.arange(len(values)),
+        "timeStamp": pd.to_datetime(1498251906 + np.arange(len(values)) * 60, unit="s"),
+        "value": values,
+    }), "sales")
+
+    expected = []
+    for end in range(1, len(values)):
+        window = values[max(0, end - 49):end + 1]
+        std = window.std(ddof=1)
+        if std > 0 and abs(values[end] - window.mean()) / std > 3:
+            expected.append(end)
+
+    anomalies = detect_anomalies_sql(conn)
+    assert list(anomalies["blockNumber"]) == expected
+    assert {5000, 15000} <= set(expected)
@@ -0,0 +1,91 @@
+# tests/test_utils.py
+import json
+import time
+import threading
+import pandas as pd
+from scripts import utils
+
+def test_instrument_is_passthrough_when_disabled(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, "TELEMETRY_PATH", None)
+    monkeypatch.setattr(utils, "PROFILE_THRESHOLD", 0)
+
+    @utils.instrument()
+    def double(x):
+        return x * 2
+
+    assert double(21) == 42
+    assert not list(tmp_path.iterdir())
+
+def test_instrument_writes_json_lines(monkeypatch, tmp_path):
+    sink = tmp_path / "telemetry.jsonl"
+    monkeypatch.setattr(utils, "TELEMETRY_PATH", str(sink))
+
+    @utils.instrument("head")
+    def head(df):
+        return df.head(2)
+
+    head(pd.DataFrame({"value": [1, 2, 3, 4]}))
+
+    record = json.loads(sink.read_text().splitlines()[0])
+    assert record["stage"] == "head"
+    assert record["rows_in"] == 4
+    assert record["rows_out"] == 2
+    assert record["status"] == "ok"
+    assert record["wall_seconds"] >= 0
+
+def test_stage_span_writes_prometheus_text(monkeypatch, tmp_path):
+    sink = tmp_path / "telemetry.prom"
+    monkeypatch.setattr(utils, "TELEMETRY_PATH", str(sink))
+    monkeypatch.setattr(utils, "_prometheus_samples", None)
+
+    with utils.stage_span("merge", rows_in=10) as span:
+        span["rows_out"] = 5
+
+    lines = sink.read_text().splitlines()
+    assert "# TYPE cryptopunks_stage_rows_in gauge" in lines
+    assert 'cryptopunks_stage_rows_in{stage="merge"} 10.0' in lines
+    assert 'cryptopunks_stage_rows_out{stage="merge"} 5.0' in lines
+    assert not any(line.startswith("cryptopunks_stage_timestamp") for line in lines)
+
+def test_prometheus_sink_keeps_latest_value_per_stage(monkeypatch, tmp_path):
+    sink = tmp_path / "telemetry.prom"
+    monkeypatch.setattr(utils, "TELEMETRY_PATH", str(sink))
+    monkeypatch.setattr(utils, "_prometheus_samples", None)
+
+    with utils.stage_span("merge", rows_in=10):
+        pass
+    with utils.stage_span("clean", rows_in=3):
+        pass
+    # A new process picks up the existing file instead of starting over
+    monkeypatch.setattr(utils, "_prometheus_samples", None)
+    with utils.stage_span("merge", rows_in=20):
+        pass
+
+    lines = sink.read_text().splitlines()
+    series = [line.rsplit(" ", 1)[0] for line in lines if not line.startswith("#")]
+    assert len(series) == len(set(series))
+    assert lines.count("# TYPE cryptopunks_stage_rows_in gauge") == 1
+    assert 'cryptopunks_stage_rows_in{stage="merge"} 20.0' in lines
+    assert 'cryptopunks_stage_rows_in{stage="clean"} 3.0' in lines
+
+def test_stage_span_cpu_time_is_per_thread(monkeypatch, tmp_path):
+    sink = tmp_path / "telemetry.jsonl"
+    monkeypatch.setattr(utils, "TELEMETRY_PATH", str(sink))
+    stop = threading.Event()
+
+    def busy():
+        while not stop.is_set():
+            pass
+
+    worker = threading.Thread(target=busy)
+    worker.start()
+    try:
+        with utils.stage_span("sleep"):
+            time.sleep(0.3)
+    finally:
+        stop.set()
+        worker.join()
+
+    record = json.loads(sink.read_text().splitlines()[0])
+    assert record["cpu_seconds"] < 0.1
+    assert record["wall_seconds"] >= 0.3